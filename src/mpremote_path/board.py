@@ -6,6 +6,7 @@ mpremote.
 from __future__ import annotations
 
 import ast
+import errno
 import itertools
 import logging
 import os
@@ -18,6 +19,7 @@ from typing import (
     Any,
     Callable,
     Generator,
+    Iterable,
     Literal,
     TypeVar,
     cast,
@@ -27,10 +29,69 @@ from typing import (
 import mpremote.transport_serial
 from mpremote.transport_serial import SerialTransport, TransportError
 
+try:  # mpremote >= 1.24.0
+    from mpremote.transport import TransportExecError, _convert_filesystem_error
+except ImportError:  # Older versions of mpremote raise a plain TransportError
+    TransportExecError = TransportError  # type: ignore
+
+    def _convert_filesystem_error(e: TransportError, info: str) -> Exception:  # type: ignore
+        """Return the `OSError` matching the micropython traceback in `e` (or
+        `e` if it is not an `OSError`)."""
+        output = e.args[2].decode() if len(e.args) >= 3 else ""
+        if "OSError" in output:
+            for code, name in errno.errorcode.items():
+                if name in output:
+                    return OSError(code, info)
+            if match := re.search(r"OSError: (\d+)", output):
+                return OSError(int(match.group(1)), info)
+        return e
+
 logger = logging.getLogger(__name__)
 
 time_offset_tolerance = 1  # seconds
 
+# Default size of chunks for reading and writing files on the board (as used by
+# mpremote). The board holds each chunk and its `repr()` (up to 4 times larger
+# for binary data) in memory, so keep it small enough for boards with little
+# free RAM. Larger chunks save round-trips on boards with more memory.
+default_chunk_size = 256
+
+# Micropython helper functions installed on the board by `install_helpers()`,
+# so later commands need only send a short call to the board.
+helper_code = """\
+import os
+def _ls_stat(p):
+ for f in os.ilistdir(p):
+  s=os.stat(p.rstrip('/')+'/'+f[0]);print((f[0],s[6],s[8],s[0]),end=',')
+def _ls_tree(p,r=''):
+ for f in list(os.ilistdir(p)):
+  q=p.rstrip('/')+'/'+f[0];s=os.stat(q);print((r+f[0],s[6],s[8],s[0]),end=',')
+  if s[0]&0x4000:_ls_tree(q,r+f[0]+'/')
+def _copyfile(a,b):
+ m=memoryview(bytearray(512))
+ with open(a,'rb') as s,open(b,'wb') as t:
+  while n:=s.readinto(m):t.write(m[:n])
+def _cp_tree(a,b,v):
+ if os.stat(a)[0]&0x4000:
+  v and print(a+'/ -> '+b+'/')
+  try:os.mkdir(b)
+  except OSError:
+   if not os.stat(b)[0]&0x4000:raise
+  for f in list(os.ilistdir(a)):
+   _cp_tree(a.rstrip('/')+'/'+f[0],b.rstrip('/')+'/'+f[0],v)
+ else:
+  v and print(a+' -> '+b)
+  _copyfile(a,b)
+def _rm_tree(p,d,v):
+ if d:
+  for f in list(os.ilistdir(p)):_rm_tree(p.rstrip('/')+'/'+f[0],f[1]&0x4000,v)
+  os.rmdir(p)
+  v and print(p+'/')
+ else:
+  os.remove(p)
+  v and print(p)
+"""
+
 
 # Override the mpremote stdout writer which fails if stdout does not have a
 # .buffer() method (eg. when running in a jupyter notebook)
@@ -43,13 +104,25 @@ def _mpath_stdout_write_bytes(b: bytes) -> None:
 mpremote.transport_serial.stdout_write_bytes = _mpath_stdout_write_bytes
 
 
+# Patterns to convert between short and full names of serial port devices
+_long_names = [
+    (re.compile(r"^u([0-9]+)$"), r"/dev/ttyUSB\1"),
+    (re.compile(r"^a([0-9]+)$"), r"/dev/ttyACM\1"),
+    (re.compile(r"^c([0-9]+)$"), r"COM\1"),
+]
+_short_names = [
+    (re.compile(r"^/dev/ttyUSB([0-9]+)$"), r"u\1"),
+    (re.compile(r"^/dev/ttyACM([0-9]+)$"), r"a\1"),
+    (re.compile(r"^/COM([0-9]+)$"), r"c\1"),
+]
+
+
 def device_long_name(device: str) -> str:
     """Return the full name of a serial port device file.
     `device` may be a port name (eg. "/dev/ttyUSB0") or a short name (eg. "u0")
     """
-    device = re.sub(r"^u([0-9]+)$", r"/dev/ttyUSB\1", device)
-    device = re.sub(r"^a([0-9]+)$", r"/dev/ttyACM\1", device)
-    device = re.sub(r"^c([0-9]+)$", r"COM\1", device)
+    for pattern, name in _long_names:
+        device = pattern.sub(name, device)
     return device
 
 
@@ -57,9 +130,8 @@ def device_short_name(device: str) -> str:
     """Return the short name of a serial port device file.
     `device` may be a full port name (eg. "/dev/ttyUSB0") or a short name (eg. "u0")
     """
-    device = re.sub(r"^/dev/ttyUSB([0-9]+)$", r"u\1", device)
-    device = re.sub(r"^/dev/ttyACM([0-9]+)$", r"a\1", device)
-    device = re.sub(r"^/COM([0-9]+)$", r"c\1", device)
+    for pattern, name in _short_names:
+        device = pattern.sub(name, device)
     return device
 
 
@@ -97,7 +169,7 @@ T = TypeVar("T", bound=Callable[..., Any])
 # Decorator to log args and return values of calls to methods of a class
 def logmethod(func: T, level: int = logging.DEBUG) -> T:
     def wrap(*args: Any, **kwargs: Any) -> Any:
-        if logger.getEffectiveLevel() < level:
+        if not logger.isEnabledFor(level):  # Skip formatting the args
             return func(*args, **kwargs)
         cls, method = args[0], func.__name__
         arg_str = ", ".join(
@@ -106,9 +178,9 @@ def logmethod(func: T, level: int = logging.DEBUG) -> T:
                 (f"{k}={v!r}" for k, v in kwargs.items()),
             )
         )
-        logger.log(level, f"{cls}.{method}({arg_str})")
+        logger.log(level, "%s.%s(%s)", cls, method, arg_str)
         result = func(*args, **kwargs)
-        logger.log(level, f"{cls}.{method}() returned: {result!r}")
+        logger.log(level, "%s.%s() returned: %r", cls, method, result)
         return result
 
     return cast(T, wrap)
@@ -140,6 +212,9 @@ class Board:
         self._writer = writer
         self.epoch_offset: int = 0
         self.clock_offset: int = 0
+        self.helpers_installed: bool = False
+        self._stat_cache: dict[str, os.stat_result | None] | None = None
+        self._cwd: str | None = None  # Cached working directory (in stat_cache)
 
     def __repr__(self) -> str:
         return f"Board({self.short_name!r})"
@@ -194,6 +269,15 @@ class Board:
     def soft_reset(self) -> None:
         self._transport.enter_raw_repl(soft_reset=True)
         self._transport.exit_raw_repl()
+        self.helpers_installed = False  # A soft reset clears the board globals
+
+    def install_helpers(self) -> None:
+        """Import the modules and define the `helper_code` functions used by
+        `MPRemotePath` and `mpfsops` on the micropython board. Does nothing if
+        they have already been installed on this connection."""
+        if not self.helpers_installed:
+            self.exec(helper_code)
+            self.helpers_installed = True
 
     # Convenience methods to execute stuff in the raw_repl on the micropython board
     @logmethod
@@ -204,6 +288,17 @@ class Board:
         with self.raw_repl(code) as r:
             return r.exec(code, None if capture else self.writer).decode().strip()
 
+    @logmethod
+    def fs_exec(self, code: str, filename: str) -> None:
+        """Execute `code` on the micropython board to operate on `filename`.
+        Output is printed via `Board.writer()`. Errors from the board are
+        raised as `OSError` (eg. `FileNotFoundError`)."""
+        with self.raw_repl(code) as r:
+            try:
+                r.exec(code, self.writer)
+            except TransportExecError as e:
+                raise _convert_filesystem_error(e, filename) from None
+
     if TYPE_CHECKING:
 
         @overload
@@ -262,17 +357,132 @@ class Board:
                     int(self.eval("time.time()")) + self.epoch_offset - time.time()
                 )
 
+    def fs_readfile_chunks(
+        self, filename: str, chunk_size: int = default_chunk_size
+    ) -> Generator[bytes, None, None]:
+        """Read `filename` on the board and yield the contents in chunks of up
+        to `chunk_size` bytes. Raises `OSError` (eg. `FileNotFoundError`) on
+        errors from the board. The file on the board is closed even if the
+        generator is closed before the end of the file."""
+        with self.raw_repl(filename) as r:
+            try:
+                r.exec(f"f=open({filename!r},'rb')\nr=f.read")
+            except TransportExecError as e:
+                raise _convert_filesystem_error(e, filename) from None
+            try:
+                while chunk := r.eval(f"r({chunk_size})", parse=True):
+                    yield chunk
+            except TransportExecError as e:
+                raise _convert_filesystem_error(e, filename) from None
+            finally:
+                r.exec("f.close()")
+
+    def fs_readfile_into(
+        self, filename: str, buf: bytearray, chunk_size: int = default_chunk_size
+    ) -> int:
+        """Read the contents of `filename` on the board and append them to the
+        caller-owned `buf` (avoids holding a second copy of the file contents on
+        the host). Returns the number of bytes read."""
+        start = len(buf)
+        for chunk in self.fs_readfile_chunks(filename, chunk_size):
+            buf.extend(chunk)
+        return len(buf) - start
+
+    def fs_writefile_chunks(
+        self,
+        filename: str,
+        chunks: Iterable[bytes],
+        chunk_size: int = default_chunk_size,
+    ) -> int:
+        """Write each of the `chunks` in turn to `filename` on the board, so the
+        whole file need not be held in memory. Small chunks are joined and
+        large chunks are split, so each write to the board is `chunk_size`
+        bytes (except the last). Returns the number of bytes written. Raises
+        `OSError` (eg. `FileNotFoundError`) on errors from the board."""
+        size = 0
+        pending = bytearray()
+        with self.raw_repl(filename) as r:
+            try:
+                r.exec(f"f=open({filename!r},'wb')\nw=f.write")
+                for chunk in chunks:
+                    pending += chunk
+                    while len(pending) >= chunk_size:
+                        r.exec(f"w({bytes(pending[:chunk_size])!r})")
+                        size += chunk_size
+                        del pending[:chunk_size]
+                if pending:
+                    r.exec(f"w({bytes(pending)!r})")
+                    size += len(pending)
+                r.exec("f.close()")
+            except TransportExecError as e:
+                raise _convert_filesystem_error(e, filename) from None
+        return size
+
+    @contextmanager
+    def stat_cache(self) -> Generator[None, None, None]:
+        """A context manager to cache the results of `fs_stat()` (including
+        missing files) and `getcwd()` until exit. Use this to wrap commands
+        which query the same files many times. The cache is cleared by
+        `clear_stat_cache()` whenever files on the board are changed. May be
+        nested."""
+        if self._stat_cache is not None:
+            yield
+            return
+        self._stat_cache = {}
+        try:
+            yield
+        finally:
+            self._stat_cache = None
+            self._cwd = None
+
+    def clear_stat_cache(self) -> None:
+        """Discard any cached `fs_stat()` results. Must be called after any
+        change to the files on the board or to the working directory."""
+        if self._stat_cache:
+            self._stat_cache.clear()
+
+    def getcwd(self) -> str:
+        """Return the working directory on the board. The result is cached
+        while inside a `Board.stat_cache()` context."""
+        if self._cwd is not None:
+            return self._cwd
+        cwd: str = self.eval("os.getcwd()")
+        if self._stat_cache is not None:
+            self._cwd = cwd
+        return cwd
+
+    def chdir(self, path: str) -> None:
+        """Change the working directory on the board to `path`."""
+        self._cwd = None
+        self.exec(f"os.chdir({path!r})")
+        self.clear_stat_cache()  # Relative paths may now refer elsewhere
+
     @logmethod
     def fs_stat(self, filename: str) -> os.stat_result:
         """Wrapper around the mpremote `SerialTransport.fs_stat()` method.
         Converts the micropython timestamps to a unix timestamp by adding the
         epoch offset calculated by `Board.check_clock()`. Note: does not correct
         for differences between the host clock and the micropython clock. Use
-        `Board.check_clock(set_clock=True)` to synchronise the clocks."""
-        with self.raw_repl() as r:
-            stat = r.fs_stat(filename)
-        if stat is None:
-            raise FileNotFoundError(f"No such file or directory: '{self}'")
-        return os.stat_result(  # Add epoch_offset to the micropython timestamps
-            stat[:-3] + tuple((t + self.epoch_offset for t in stat[-3:]))
-        )
+        `Board.check_clock(set_clock=True)` to synchronise the clocks.
+        Results are cached while inside a `Board.stat_cache()` context."""
+        cache = self._stat_cache
+        if cache is not None and filename in cache:
+            result = cache[filename]
+        else:
+            try:
+                with self.raw_repl() as r:
+                    stat = r.fs_stat(filename)
+            except FileNotFoundError:
+                stat = None  # mpremote >= 1.24.0 raises instead of returning None
+            result = (
+                None
+                if stat is None
+                else os.stat_result(  # Add epoch_offset to micropython timestamps
+                    stat[:-3] + tuple((t + self.epoch_offset for t in stat[-3:]))
+                )
+            )
+            if cache is not None:
+                cache[filename] = result
+        if result is None:
+            raise FileNotFoundError(f"No such file or directory: '{filename}'")
+        return result
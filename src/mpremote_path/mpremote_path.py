@@ -9,8 +9,10 @@ interface to accessing and manipulating files on micropython boards via the
 # For python<3.10: Allow method type annotations to reference enclosing class
 from __future__ import annotations
 
+import codecs
 import io
 import os
+import re
 import stat
 import sys
 from pathlib import Path, PurePath, PurePosixPath, PureWindowsPath
@@ -21,6 +23,7 @@ from typing import (
     Any,
     BinaryIO,
     Generator,
+    Iterable,
     Iterator,
     Literal,
     Union,
@@ -30,7 +33,13 @@ from typing import (
 
 from mpremote.transport_serial import SerialTransport
 
-from .board import Board, make_board
+from .board import (
+    Board,
+    TransportExecError,
+    _convert_filesystem_error,
+    default_chunk_size,
+    make_board,
+)
 
 if TYPE_CHECKING:
     from _typeshed import (
@@ -55,10 +64,13 @@ def mpremotepath(f: str | PathType) -> MPRemotePath:
     return f if isinstance(f, MPRemotePath) else MPRemotePath(f)
 
 
+_wildcard_re = re.compile(r"[*?[]")  # Characters which start a glob pattern
+
+
 def is_wildcard_pattern(pat: str) -> bool:
     """Whether this pattern needs actual matching using `glob()`, or can
     be looked up directly as a file."""
-    return "*" in pat or "?" in pat or "[" in pat
+    return _wildcard_re.search(pat) is not None
 
 
 class MPRemoteDirEntry:
@@ -189,6 +201,7 @@ class PathWriter(io.BytesIO):
     def close(self) -> None:
         with self.board.raw_repl() as r:
             r.fs_writefile(self.path, self.getvalue())
+        self.board.clear_stat_cache()
         super().close()
 
 
@@ -198,7 +211,7 @@ class MPRemotePath(Path, PurePosixPath):
 
     # __slots__ = ("_stat", "board")
     board: Board
-    _stat: os.stat_result | None
+    _stat: os.stat_result | None = None  # Default for paths made by pathlib
     _drv: str  # Declare types for properties inherited from pathlib classes
     _root: str
     _parts: list[str]
@@ -225,6 +238,7 @@ class MPRemotePath(Path, PurePosixPath):
             self = cast(MPRemotePath, getattr(cls, "_from_parts")(args))
         else:
             self = super().__new__(cls, *args)
+        self._stat = None
         return self
 
     def with_segments(self, *pathsegments: str | PathType) -> MPRemotePath:
@@ -255,29 +269,22 @@ class MPRemotePath(Path, PurePosixPath):
         `baud` and `wait` are only used if `port` is a string.
         """
         cls.board = make_board(port, baud, wait, set_clock=set_clock, utc=utc)
-        cls.board.exec("import os")
+        cls.board.install_helpers()
 
     def chdir(self) -> MPRemotePath:
         "Set the current working directory on the board to this path." ""
         p = self.resolve()
-        self.board.exec(f"os.chdir('{p}')")
+        self.board.chdir(str(p))
         return p
 
     def copyfile(self, target: MPRemotePath | str) -> MPRemotePath:
         target = mpremotepath(target)
         if self.samefile(target):
             raise SameFileError(f"{self!s} and {target!s} are the same file")
-        target.write_bytes(self.read_bytes())
-        # with self.board.raw_repl() as r:
-        #     r.fs_writefile(str(target), r.fs_readfile(str(self)))
-        # r.exec(
-        #     "def _f(a,b):\n"
-        #     " b=memoryview(bytearray(512))\n"
-        #     " with open(a,'rb') as s, open(b,'wb') as t:\n"
-        #     "  while n:=s.readinto(b):\n"
-        #     "   t.write(b[:n])\n"
-        #     f"_f({str(self)!r},{str(target)!r})"
-        # )
+        self.board.install_helpers()  # Copy the file on the board
+        self.board.fs_exec(f"_copyfile({str(self)!r},{str(target)!r})", str(self))
+        target._stat = None
+        self.board.clear_stat_cache()
         return target
 
     def copy(self, target: MPRemotePath | str) -> MPRemotePath:
@@ -289,7 +296,7 @@ class MPRemotePath(Path, PurePosixPath):
     def cwd(cls) -> MPRemotePath:
         if not cls.board:
             raise ValueError("RemotePath.board must be set before use.")
-        return cls(cls.board.eval("os.getcwd()"))
+        return cls(cls.board.getcwd())
 
     # Overrides for pathlib.Path methods
     @classmethod
@@ -322,18 +329,20 @@ class MPRemotePath(Path, PurePosixPath):
     def resolve(self, strict: bool = False) -> MPRemotePath:
         # The fs on the board has no concept of symlinks, so just eliminate ".."
         # and "." from the absolute path.
-        is_abs = self.is_absolute()
-        parts = self.parts if is_abs else (self.cwd().parts + self.parts)
+        parts = self.parts
+        if ".." not in parts and "." not in parts:
+            if self.is_absolute():
+                return self  # Already canonical (eg. paths from iterdir())
+            return self.cwd().joinpath(*parts)
+        if not self.is_absolute():
+            parts = self.cwd().parts + parts
         new_parts: list[str] = []
         for p in parts:
             if p == ".." and new_parts:
                 new_parts.pop()
             elif p != ".":
                 new_parts.append(p)
-        return (
-            self if is_abs and new_parts == list(parts) else
-            self.with_segments(*new_parts)
-        )  # fmt: skip
+        return self.with_segments(*new_parts)
 
     def samefile(self, other_path: Union[str, os.PathLike[str]]) -> bool:
         if isinstance(other_path, str):
@@ -344,7 +353,7 @@ class MPRemotePath(Path, PurePosixPath):
         )
 
     def stat(self, *, follow_symlinks: bool = False) -> os.stat_result:
-        if hasattr(self, "_stat") and self._stat is not None:
+        if self._stat is not None:
             return self._stat
         stat = self.board.fs_stat(str(self))
         self._stat = stat
@@ -458,15 +467,37 @@ class MPRemotePath(Path, PurePosixPath):
             return r.fs_readfile(str(self))
 
     def read_text(self, encoding: str | None = None, errors: str | None = None) -> str:
-        return self.read_bytes().decode(encoding or "utf-8", errors or "strict")
+        buf = bytearray()  # Decode straight from the buffer, without a bytes copy
+        self.board.fs_readfile_into(str(self), buf)
+        decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors or "strict")
+        return decoder.decode(buf, final=True)
 
     def write_bytes(self, data: ReadableBuffer) -> int:
         self._stat = None
+        self.board.clear_stat_cache()
         buf = bytes(data)
         with self.board.raw_repl() as r:
             r.fs_writefile(str(self), buf)
         return len(buf)
 
+    def read_chunks(
+        self, chunk_size: int = default_chunk_size
+    ) -> Generator[bytes, None, None]:
+        """Yield the contents of the file in chunks of up to `chunk_size`
+        bytes, without reading the whole file into memory. Call `close()` on
+        the generator (eg. with `contextlib.closing()`) to stop reading early."""
+        return self.board.fs_readfile_chunks(str(self), chunk_size)
+
+    def write_chunks(
+        self, chunks: Iterable[bytes], chunk_size: int = default_chunk_size
+    ) -> int:
+        """Write each of the `chunks` in turn to the file, without holding the
+        whole file in memory. The data is sent to the board in writes of up
+        to `chunk_size` bytes. Returns the number of bytes written."""
+        self._stat = None
+        self.board.clear_stat_cache()
+        return self.board.fs_writefile_chunks(str(self), chunks, chunk_size)
+
     def write_text(
         self,
         data: str,
@@ -481,6 +512,7 @@ class MPRemotePath(Path, PurePosixPath):
 
     def touch(self, mode: int = 0o666, exist_ok: bool = True) -> None:
         self._stat = None
+        self.board.clear_stat_cache()
         with self.board.raw_repl() as r:
             if hasattr(r, "fs_touchfile"):
                 r.fs_touchfile(str(self))  # mpremote >= 1.24.0
@@ -491,8 +523,23 @@ class MPRemotePath(Path, PurePosixPath):
         self, mode: int = 0o777, parents: bool = False, exist_ok: bool = False
     ) -> None:
         self._stat = None
-        with self.board.raw_repl() as r:
-            r.fs_mkdir(str(self))
+        self.board.clear_stat_cache()
+        try:
+            with self.board.raw_repl() as r:
+                try:
+                    r.fs_mkdir(str(self))
+                except TransportExecError as e:  # mpremote < 1.24.0
+                    raise _convert_filesystem_error(e, str(self)) from None
+        except FileNotFoundError:
+            if not parents or self.parent == self:
+                raise
+            self.parent.mkdir(parents=True, exist_ok=True)
+            self.mkdir(mode, parents=False, exist_ok=exist_ok)
+        except OSError:
+            # Cannot rely on checking for EEXIST, since the operating system
+            # could give priority to other errors like EACCES or EROFS
+            if not exist_ok or not self.is_dir():
+                raise
 
     def chmod(self, mode: int, *, follow_symlinks: bool = True) -> None:
         raise NotImplementedError
@@ -502,6 +549,7 @@ class MPRemotePath(Path, PurePosixPath):
 
     def unlink(self, missing_ok: bool = False) -> None:
         self._stat = None
+        self.board.clear_stat_cache()
         with self.board.raw_repl() as r:
             if hasattr(r, "fs_rmfile"):
                 r.fs_rmfile(str(self))  # mpremote >= 1.24.0
@@ -510,6 +558,7 @@ class MPRemotePath(Path, PurePosixPath):
 
     def rmdir(self) -> None:
         self._stat = None
+        self.board.clear_stat_cache()
         with self.board.raw_repl() as r:
             r.fs_rmdir(str(self))
 
@@ -518,6 +567,7 @@ class MPRemotePath(Path, PurePosixPath):
 
     def rename(self, target: str | PathType) -> MPRemotePath:
         self.board.exec(f"os.rename('{self}','{target}')")
+        self.board.clear_stat_cache()
         target = mpremotepath(target)
         target._stat = self._stat
         self._stat = None
@@ -11,7 +11,12 @@ directories.
 
 from __future__ import annotations
 
+import fnmatch
+import functools
+import re
 import shutil
+import stat
+import sys
 import time
 from pathlib import Path
 from typing import Any, Callable, Iterable, Tuple, Union
@@ -54,6 +59,29 @@ def local_path(path: Path | str, cls: type[Path] = Path) -> Path:
     )
 
 
+@functools.lru_cache(maxsize=256)
+def _compile_glob(pattern: str) -> re.Pattern[str]:
+    """Return a compiled regular expression to match filenames against the
+    wildcard `pattern` (case-sensitive, as on the micropython board)."""
+    return re.compile(fnmatch.translate(pattern))
+
+
+def _glob(cwd: Path, pattern: str, listings: dict[Path, list[Path]]) -> Iterable[Path]:
+    """Expand the wildcard `pattern` relative to `cwd`. For `MPath`s, patterns
+    with wildcards only in the last component are matched against a single
+    (cached) listing of the parent directory instead of calling `glob()`."""
+    head, _, tail = pattern.rpartition("/")
+    if not isinstance(cwd, MPath) or "**" in tail or is_wildcard_pattern(head):
+        return cwd.glob(pattern)
+    if pattern.startswith("/"):
+        head = head or "/"  # Eg. "/*.py" matches files in the root folder
+    parent = cwd / head if head else cwd
+    if parent not in listings:
+        listings[parent] = mpfsops.iterdir_stat(parent) if parent.is_dir() else []
+    match = _compile_glob(tail).match
+    return (f for f in listings[parent] if match(f.name))
+
+
 def path_list(files: FileList, cls: type[Path] = Path) -> Iterable[Path]:
     """A convenience function for creating a list of `Path` instances.
     - `files` contains the files/directories to print, which may be:
@@ -68,11 +96,18 @@ def path_list(files: FileList, cls: type[Path] = Path) -> Iterable[Path]:
     filelist: Iterable[Path | str] = (
         (files,) if isinstance(files, str) or isinstance(files, Path) else files
     )
-    cwd = cls.cwd()  # Current directory: for globbing if required
+    cwd: Path | None = None  # Current directory: only fetched for globbing
+    listings: dict[Path, list[Path]] = {}  # Cache directory listings for globs
+    paths: dict[str, Path] = {}  # Share paths (and cached stat) for repeat names
     for f in filelist:
         if isinstance(f, str) and is_wildcard_pattern(f):
             # Expand glob pattern and yield each file
-            yield from (list(cwd.glob(f)) or [cls(f)])
+            cwd = cwd or cls.cwd()
+            yield from (list(_glob(cwd, f, listings)) or [cls(f)])
+        elif isinstance(f, str):
+            if f not in paths:
+                paths[f] = cls(f)
+            yield paths[f]
         else:
             # Yield the next file - convert to cls if necessary
             yield f if isinstance(f, cls) else cls(f)
@@ -93,52 +128,76 @@ def slashify(path: Path | str) -> str:
     return s + "/" if add_slash else s
 
 
+def write_lines(lines: list[str]) -> None:
+    """Write `lines` to stdout with a single `write()` call."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+def existing_files(files: Iterable[Path], lines: list[str]) -> list[Path]:
+    """Return the `files` which exist, adding an error to `lines` for each
+    file which does not."""
+    found = []
+    for f in files:
+        if f.exists():
+            found.append(f)
+        else:
+            lines.append(f"'{f}': No such file or directory")
+    return found
+
+
 def ls_long(dirlist: Dirlist) -> None:
-    """Print a long-style file listing from a `Dirlist`."""
+    """Print a long-style file listing from a `Dirlist`.
+    Output is written once for each directory."""
     for directory, files in dirlist:
+        lines: list[str] = []
         if directory:
-            print(f"{path_formatter(directory)}:")
-        else:
-            for f in (f for f in files if not f.exists()):
-                print(f"'{f}': No such file or directory")
+            lines.append(f"{path_formatter(directory)}:")
+        else:  # Files in directory listings exist: only check the top level
+            files = existing_files(files, lines)
         for f in files:
-            st = f.stat()
-            size = st.st_size if not f.is_dir() else 0
-            t = time.strftime("%c", time.localtime(st.st_mtime)).replace(" 0", "  ")
-            print(f"{size:9d} {t[:-3]} {name_formatter(f)}")
+            st = f.stat()  # Cached in MPaths returned by `mpfsops.walk()`
+            size = st.st_size if not stat.S_ISDIR(st.st_mode) else 0
+            tm = time.localtime(st.st_mtime)  # Pad day with a space (like %e)
+            t = time.strftime(f"%a %b {tm.tm_mday:2d} %H:%M %Y", tm)
+            lines.append(f"{size:9d} {t} {name_formatter(f)}")
+        write_lines(lines)
 
 
 def ls_short(dirlist: Dirlist) -> None:
-    """Print a short-style file listing from a `Dirlist`."""
+    """Print a short-style file listing from a `Dirlist`.
+    Output is written once for each directory."""
     started = False
     columns = shutil.get_terminal_size().columns
     for directory, files in dirlist:
-        files = list(files)
-        if started:
-            print()  # Add a blank line between directory listings
+        # Add a blank line between directory listings
+        lines: list[str] = [""] if started else []
         if directory:
-            print(f"{path_formatter(directory)}:")
+            lines.append(f"{path_formatter(directory)}:")
+            files = list(files)
             started = True
-        else:
-            for f in (f for f in files if not f.exists()):
-                print(f"'{f}': No such file or directory")
-            files = [f for f in files if f.exists()]
+        else:  # Files in directory listings exist: only check the top level
+            files = existing_files(files, lines)
+        lengths = [len(f.name) for f in files]
         if not files:
             pass
-        elif len(files) < 20 and sum(len(f.name) + 2 for f in files) < columns:
+        elif len(files) < 20 and sum(lengths) + 2 * len(files) < columns:
             # Print all on one line
-            print("  ".join(name_formatter(f) for f in files))
+            lines.append("  ".join(name_formatter(f) for f in files))
             started = True
         else:
             # Print in columns - by row
-            w = max(len(f.name) for f in files) + 2
+            w = max(lengths) + 2
             spaces = " " * (w - 1)
             cols = columns // w
-            for i, f in enumerate(files, start=1):
-                print(name_formatter(f), spaces[len(f.name) :], end="")
+            row: list[str] = []
+            for i, (f, n) in enumerate(zip(files, lengths), start=1):
+                row.append(f"{name_formatter(f)} {spaces[n:]}")
                 if i % cols == 0 or i == len(files):
-                    print()
-                started = True
+                    lines.append("".join(row))
+                    row = []
+            started = True
+        write_lines(lines)
 
 
 def ls(
@@ -161,19 +220,21 @@ def ls(
     ls_func(dirlist)
 
 
-def get(files: FileList, dest: Path | str) -> Path:
+def get(files: FileList, dest: Path | str, chunk_size: int | None = None) -> Path:
     """Get files and directories from the micropython board.
-    `dest` must be an existing directory."""
+    `dest` must be an existing directory. Files are read from the board in
+    chunks of `chunk_size` bytes (default: `mpfsops.default_chunk_size`)."""
     p = local_path(dest)
-    mpfsops.copy(remote_path_list(files), p)
+    mpfsops.copy(remote_path_list(files), p, chunk_size)
     return p
 
 
-def put(files: FileList, dest: Path | str) -> MPath:
+def put(files: FileList, dest: Path | str, chunk_size: int | None = None) -> MPath:
     """Get files and directories from the micropython board.
-    `dest` must be an existing directory."""
+    `dest` must be an existing directory. Files are written to the board in
+    chunks of `chunk_size` bytes (default: `mpfsops.default_chunk_size`)."""
     p = mpremotepath(dest)
-    mpfsops.copy(local_path_list(files), p)
+    mpfsops.copy(local_path_list(files), p, chunk_size)
     return p
 
 
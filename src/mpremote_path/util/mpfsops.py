@@ -11,16 +11,23 @@ strings.
 from __future__ import annotations
 
 import shutil
+import stat
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
 from pathlib import Path
-from typing import Any, Iterable, Optional, Tuple
+from typing import Any, Generator, Iterable, Optional, Tuple
 
 from mpremote_path import MPRemotePath as MPath
+from mpremote_path.board import default_chunk_size
+from mpremote_path.mpremote_path import MPRemoteDirEntry
 
 # A directory and its contents: (directory, [file1, file2, ...])
 Dirfiles = Tuple[Optional[Path], Iterable[Path]]
 Dirlist = Iterable[Dirfiles]  # A list of directories and their contents
 
 max_depth = 20  # Default maximum depth for recursive directory listings
+max_workers = 4  # Maximum number of threads for concurrent local file copies
 
 
 def connect(*args: Any, **kwargs: Any) -> None:
@@ -29,21 +36,56 @@ def connect(*args: Any, **kwargs: Any) -> None:
     MPath.connect(*args, **kwargs)
 
 
-def copyfile(src: Path, dst: Path) -> Path:
+@contextmanager
+def raw_repl() -> Generator[None, None, None]:
+    """A context manager to hold the board in the raw repl for the duration of
+    a bulk operation, so the raw repl is only entered and exited once instead
+    of once per file. Does nothing if no board is connected."""
+    board = getattr(MPath, "board", None)
+    if board is None:
+        yield
+        return
+    with board.raw_repl():
+        yield
+
+
+@contextmanager
+def stat_cache() -> Generator[None, None, None]:
+    """A context manager to cache the `stat()` results (including missing
+    files) of files on the board for the duration of a command. See
+    `Board.stat_cache()`. Does nothing if no board is connected."""
+    board = getattr(MPath, "board", None)
+    if board is None:
+        yield
+        return
+    with board.stat_cache():
+        yield
+
+
+def copyfile(src: Path, dst: Path, chunk_size: int | None = None) -> Path:
     """Copy a regular file, with optimisations for mpremote paths.
-    `src` and `dst` can be either `Path` or `MPRemotePath` instances."""
+    `src` and `dst` can be either `Path` or `MPRemotePath` instances.
+    Files are streamed to/from the board in chunks of `chunk_size` bytes
+    (default: `default_chunk_size`)."""
+    chunk_size = chunk_size or default_chunk_size
     if not src.is_file():
         raise ValueError(f"'{src}' is not a regular file")
     elif isinstance(src, MPath) and isinstance(dst, MPath):
         src.copyfile(dst)  # Copy from micropython board to micropython board
     elif not isinstance(src, MPath) and not isinstance(dst, MPath):
         shutil.copyfile(src, dst)  # Copy local file to local file
-    else:
-        dst.write_bytes(src.read_bytes())  # Fall back to copying file content
+    elif isinstance(src, MPath):
+        # Stream from the board to a local file
+        with dst.open("wb") as f, closing(src.read_chunks(chunk_size)) as chunks:
+            for chunk in chunks:
+                f.write(chunk)
+    elif isinstance(dst, MPath):
+        with src.open("rb") as f:  # Stream from a local file to the board
+            dst.write_chunks(iter(lambda: f.read(chunk_size), b""), chunk_size)
     return dst
 
 
-def copypath(src: Path, dst: Path) -> Path:
+def copypath(src: Path, dst: Path, chunk_size: int | None = None) -> Path:
     """Copy a file or directory.
     If `src` is a regular file, call `copyfile()` to copy it to `dst`.
     If `src` is a directory, and `dst` is not a directory, make the new
@@ -56,32 +98,72 @@ def copypath(src: Path, dst: Path) -> Path:
         return dst
     else:
         print(f"{src} -> {dst}")
-        return copyfile(src, dst)
-
-
-def rcopy(src: Path, dst: Path) -> None:
-    """Copy a file or directory recursively."""
-    if copypath(src, dst):
-        if src.is_dir():
-            for child in src.iterdir():
-                rcopy(child, dst / child.name)
+        return copyfile(src, dst, chunk_size)
+
+
+def cp_tree_remote(src: MPath, dst: MPath, verbose: bool = True) -> None:
+    """Recursively copy the file or directory `src` to `dst` on the micropython
+    board using a single round-trip to the board. If `verbose` is `True`,
+    print the name of each file and directory as it is copied."""
+    board = src.board
+    board.install_helpers()
+    board.fs_exec(f"_cp_tree({str(src)!r},{str(dst)!r},{verbose})", str(src))
+    dst._stat = None
+    board.clear_stat_cache()
+
+
+def rcopy(src: Path, dst: Path, chunk_size: int | None = None) -> None:
+    """Copy a file or directory recursively.
+    Directories are created before their contents are copied. Copies between
+    local files are run concurrently in a thread pool, while copies to or from
+    the micropython board are run in order in the calling thread (the serial
+    link can only carry one transfer at a time). Copies of directories from
+    the board to the board are made by code running on the board, and the
+    contents of directories copied from the board are listed in a single
+    round-trip."""
+    if isinstance(src, MPath) and isinstance(dst, MPath) and src.is_dir():
+        cp_tree_remote(src, dst)
+        return
+    if isinstance(src, MPath) and src.is_dir():
+        with raw_repl():
+            copypath(src, dst)
+            for f in tree_stat(src):
+                copypath(f, dst / f.relative_to(src).as_posix(), chunk_size)
+        return
+    with raw_repl(), ThreadPoolExecutor(max_workers) as pool:
+        jobs = []
+        queue = deque([(src, dst)])
+        while queue:
+            s, d = queue.popleft()
+            if s.is_dir():
+                copypath(s, d)
+                queue.extend((child, d / child.name) for child in s.iterdir())
+            elif isinstance(s, MPath) or isinstance(d, MPath):
+                copypath(s, d, chunk_size)
+            else:
+                print(f"{s} -> {d}")
+                jobs.append(pool.submit(copyfile, s, d))
+        for job in jobs:
+            job.result()  # Raise any exceptions from the local copies
 
 
-def copy(files: Iterable[Path], dest: Path) -> None:
+def copy(files: Iterable[Path], dest: Path, chunk_size: int | None = None) -> None:
     """Recursively copy files and directories from `files` to `dest`.
     If `dest` is an existing directory, move all files into it.
     If `dest` is not an existing directory and there is only one source `file`
     it will be copied to `dest`.
-    Otherwise a `ValueError` is raised."""
-    it = iter(files)
-    if dest.is_dir():
-        for f in it:
-            rcopy(f, dest / f.name)
-    elif (f := next(it, None)) and next(it, None) is None:  # type: ignore
-        # If there is only one src `path`, make a copy called `dest`
-        rcopy(f, dest)
-    else:
-        raise ValueError(f"%cp: Destination must be a directory: {dest!r}")
+    Otherwise a `ValueError` is raised.
+    Files are streamed to/from the board in chunks of `chunk_size` bytes."""
+    with raw_repl(), stat_cache():
+        filelist = list(files)
+        if dest.is_dir():
+            for f in filelist:
+                rcopy(f, dest / f.name, chunk_size)
+        elif len(filelist) == 1:
+            # If there is only one src `path`, make a copy called `dest`
+            rcopy(filelist[0], dest, chunk_size)
+        else:
+            raise ValueError(f"%cp: Destination must be a directory: {dest!r}")
 
 
 def move(files: Iterable[Path], dest: Path) -> None:
@@ -91,38 +173,67 @@ def move(files: Iterable[Path], dest: Path) -> None:
     it will be renamed to `dest`.
     Otherwise a `ValueError` is raised.
     """
-    it = iter(files)
-    if dest.is_dir():  # Move all files into the dest directory
-        for src in it:
-            dst = dest / src.name
+    with raw_repl(), stat_cache():
+        it = iter(files)
+        if dest.is_dir():  # Move all files into the dest directory
+            for src in it:
+                dst = dest / src.name
+                slash = "/" if src.is_dir() else ""
+                print(f"{src}{slash} -> {dst}{slash}")
+                src.rename(dst)
+        elif (src := next(it, None)) is not None and next(it, None) is None:  # type: ignore
+            # If there is only one src `path`, rename it to `dest`
             slash = "/" if src.is_dir() else ""
-            print(f"{src}{slash} -> {dst}{slash}")
-            src.rename(dst)
-    elif (src := next(it, None)) is not None and next(it, None) is None:  # type: ignore
-        # If there is only one src `path`, rename it to `dest`
-        slash = "/" if src.is_dir() else ""
-        print(f"{src}{slash} -> {dest}{slash}")
-        src.rename(dest)
+            print(f"{src}{slash} -> {dest}{slash}")
+            src.rename(dest)
+        else:
+            raise ValueError(f"%mv: Destination is not a directory: {dest!r}")
+
+
+def rm_tree_remote(path: MPath, verbose: bool = True, missing_ok: bool = False) -> None:
+    """Remove the file or directory tree at `path` on the micropython board
+    using a single round-trip to the board. If `verbose` is `True`, print the
+    name of each file and directory as it is removed. If `missing_ok` is
+    `True`, do nothing if `path` does not exist."""
+    board = path.board
+    board.install_helpers()
+    p = str(path)
+    if missing_ok:  # Check for the file on the board: saves a round-trip
+        board.fs_exec(
+            f"try:s=os.stat({p!r})\nexcept OSError:s=None\n"
+            f"if s:_rm_tree({p!r},s[0]&0x4000,{verbose})",
+            p,
+        )
     else:
-        raise ValueError(f"%mv: Destination is not a directory: {dest!r}")
+        board.fs_exec(f"_rm_tree({p!r},{path.is_dir()},{verbose})", p)
+    path._stat = None
+    board.clear_stat_cache()
 
 
 def remove(files: Iterable[Path], recursive: bool = False) -> None:
     """Remove (delete) files (and directories if `recursive` is `True`)."""
-    for f in files:
-        if f.is_file():
-            print(f"{str(f)}")
-            f.unlink()
-        elif f.is_dir():
-            if recursive:
-                remove(f.iterdir(), recursive)
+    with raw_repl(), stat_cache():
+        # Stack of (path, emptied): `emptied` is True once dir contents are gone
+        stack = [(f, False) for f in reversed(list(files))]
+        while stack:
+            f, emptied = stack.pop()
+            if emptied:
                 print(f"{str(f)}/")
                 f.rmdir()
-            else:
-                print(
-                    f"Skipping '{str(f)}/' "
-                    "(use `recursive=True` to delete directories)"
-                )
+            elif f.is_file():
+                print(f"{str(f)}")
+                f.unlink()
+            elif f.is_dir():
+                if isinstance(f, MPath) and recursive:
+                    rm_tree_remote(f)  # One round-trip for the whole tree
+                elif recursive:  # Remove the contents, then the directory
+                    stack.append((f, True))
+                    stack.extend((c, False) for c in reversed(list(f.iterdir())))
+                else:
+                    print(
+                        f"Skipping '{str(f)}/' "
+                        "(use `recursive=True` to delete directories)"
+                    )
 
 
 def cwd() -> MPath:
@@ -130,40 +241,92 @@ def cwd() -> MPath:
     return MPath.cwd()
 
 
+def listdir_stat(path: MPath) -> list[tuple[str, int, int, int]]:
+    """Return a list of `(name, size, mtime, mode)` tuples for the contents of
+    the directory `path` on the micropython board, using a single round-trip
+    to the board. `mtime` is converted to a unix timestamp."""
+    board = path.board
+    board.install_helpers()
+    files: tuple[tuple[str, int, int, int], ...] = (
+        board.exec_eval(f"_ls_stat({str(path)!r})") or ()
+    )
+    return [(name, size, t + board.epoch_offset, mode) for name, size, t, mode in files]
+
+
+def iterdir_stat(path: Path) -> list[Path]:
+    """Return the contents of the directory `path`. For `MPath` directories the
+    `stat()` results of each file are fetched in a single round-trip to the
+    board and cached in the returned paths."""
+    if not isinstance(path, MPath):
+        return list(path.iterdir())
+    parent = str(path)
+    return [
+        path._from_direntry(
+            MPRemoteDirEntry(path.board, parent, name, mode, 0, size, mtime)
+        )
+        for name, size, mtime, mode in listdir_stat(path)
+    ]
+
+
+def tree_stat(path: MPath) -> list[MPath]:
+    """Return all the files and directories under the directory `path` on the
+    micropython board, with their `stat()` results cached, using a single
+    round-trip to the board. Directories are listed before their contents."""
+    board = path.board
+    board.install_helpers()
+    files: tuple[tuple[str, int, int, int], ...] = (
+        board.exec_eval(f"_ls_tree({str(path)!r})") or ()
+    )
+    entries = []
+    for name, size, t, mode in files:
+        p = path / name
+        entry = MPRemoteDirEntry(
+            board, str(p.parent), p.name, mode, 0, size, t + board.epoch_offset
+        )
+        entries.append(p.parent._from_direntry(entry))
+    return entries
+
+
 def walk(path: Path, depth: int = max_depth) -> Dirlist:
     """Return a directory list of `path` (must be directory) up to `depth` deep.
     If `depth` is 0, only the top level directory is listed."""
-    if path.is_dir():
-        files = sorted(path.iterdir())
-        yield (path, files)
-        if depth > 0:
-            for child in (f for f in files if f.is_dir()):
-                yield from walk(child, depth - 1)
+    if not path.is_dir():
+        return
+    stack = [(path, depth)]  # Directories still to be listed
+    while stack:
+        directory, level = stack.pop()
+        files = sorted(iterdir_stat(directory))
+        yield (directory, files)
+        if level > 0:  # Push subdirs in reverse, so they are listed in order
+            stack.extend((f, level - 1) for f in reversed(files) if f.is_dir())
 
 
 def walk_files(files: Iterable[Path], recursive: bool = False) -> Dirlist:
     """Return a directory list of all `files`, which may be regular files or
     directories. If `recursive` is `True`, list all files in subdirectories
-    recursively."""
-    files = sorted(files)
-    dirs = [f for f in files if f.is_dir()]
-    if not recursive and len(dirs) == len(files) == 1:
-        # If only one directory in list, just list the files in that directory
-        _dir, files = next(iter(walk(dirs[0], 0)))
-        yield (None, files)
-        return
-    yield (None, [f for f in files if not f.is_dir()])
-    for f in dirs:
-        yield from walk(f, max_depth if recursive else 0)
+    recursively. All the directories are listed before returning (so the
+    board's stat cache is only used while listing), so callers may change
+    files on the board while using the result."""
+    with raw_repl(), stat_cache():
+        entries = [(f, f.is_dir()) for f in sorted(files)]  # is_dir() once each
+        dirs = [f for f, is_dir in entries if is_dir]
+        if not recursive and len(dirs) == len(entries) == 1:
+            # If only one directory in list, just list the files in that directory
+            _dir, dirfiles = next(iter(walk(dirs[0], 0)))
+            return [(None, dirfiles)]
+        dirlist: list[Dirfiles] = [(None, [f for f, is_dir in entries if not is_dir])]
+        for f in dirs:
+            dirlist.extend(walk(f, max_depth if recursive else 0))
+        return dirlist
 
 
 def skip_file(src: Path, dst: Path) -> bool:
     "If local is not newer than remote, return True."
-    s, d = src.stat(), dst.stat()
-    return (src.is_dir() and dst.is_dir()) or (
-        src.is_file()
-        and dst.is_file()
-        and round((d := dst.stat()).st_mtime) >= round((s := src.stat()).st_mtime)
+    s, d = src.stat(), dst.stat()  # Only stat each file once
+    return (stat.S_ISDIR(s.st_mode) and stat.S_ISDIR(d.st_mode)) or (
+        stat.S_ISREG(s.st_mode)
+        and stat.S_ISREG(d.st_mode)
+        and round(d.st_mtime) >= round(s.st_mtime)
         and d.st_size == s.st_size
     )
 
@@ -172,20 +335,31 @@ def check_files(
     cmd: str, files: Iterable[Path], dest: Path | None = None, opts: str = ""
 ) -> tuple[list[Path], Path | None]:
     filelist = list(files)
-    missing = [str(f) for f in filelist if not f.exists()]
-    dirs = [str(d) + "/" for d in filelist if d.is_dir()]
+    missing: list[str] = []
+    dirs: list[str] = []
+    error = ""  # The first error found with `dest` (if any)
+    with raw_repl(), stat_cache():
+        for f in filelist:  # Check all the files in one pass: one stat() each
+            try:
+                is_dir = stat.S_ISDIR(f.stat().st_mode)
+            except (FileNotFoundError, NotADirectoryError):
+                missing.append(str(f))
+                continue
+            if is_dir:
+                dirs.append(str(f) + "/")
+            if not dest or error:
+                pass
+            elif is_dir and f in dest.parents:
+                error = f"{dest!r} is subfolder of {f!r}"
+            elif str(f) == str(dest):
+                error = f"source is same as dest: {f!r}"
     # Check for invalid requests
     if missing:
         print(f"%{cmd}: Error: Missing files: {missing}.")
         return ([], None)
-    if dest:
-        for f in filelist:
-            if f.is_dir() and f in dest.parents:
-                print(f"%{cmd}: Error: {dest!r} is subfolder of {f!r}")
-                return ([], None)
-            if str(f) == str(dest):
-                print(f"%{cmd}: Error: source is same as dest: {f!r}")
-                return ([], None)
+    if error:
+        print(f"%{cmd}: Error: {error}")
+        return ([], None)
     if dirs and cmd in ["rm", "cp", "get", "put"] and "r" not in opts:
         print(f'%{cmd}: Error: Can not process dirs (use "{cmd} -r"): {dirs}')
         return ([], None)
@@ -1,25 +1,49 @@
-import itertools
-from pathlib import Path
-from typing import Iterable
+import os
+import stat
+from pathlib import Path, PurePosixPath
+from typing import Iterator, Tuple
 
+from mpremote_path import MPRemotePath as MPath
 
-def ls_dir(path: Path) -> Iterable[Path]:
-    """List all the files and dirs recursively."""
-    if path.is_dir():
-        return itertools.chain(
-            (child.relative_to(path) for child in path.iterdir()),
-            itertools.chain.from_iterable(
-                ls_dir(child) for child in path.iterdir() if child.is_dir()
-            ),
-        )
-    raise ValueError(f"{path} is not a directory")
+# A file in a directory listing: (relative path, is_dir, size)
+Entry = Tuple[PurePosixPath, bool, int]
+
+
+def scandir(path: Path) -> Iterator[Tuple[str, bool, int]]:
+    """Yield the name, is_dir flag and size of each entry in a directory, using
+    the stat info cached by `os.scandir()` or `MPath.iterdir()`."""
+    if isinstance(path, MPath):
+        yield from ((f.name, f.is_dir(), f.stat().st_size) for f in path.iterdir())
+        return
+    with os.scandir(path) as it:
+        for entry in list(it):
+            is_dir = entry.is_dir(follow_symlinks=False)
+            yield entry.name, is_dir, 0 if is_dir else entry.stat().st_size
+
+
+def walk_dir(path: Path, rel: PurePosixPath = PurePosixPath()) -> Iterator[Entry]:
+    """List all the files and dirs recursively in a single pass."""
+    for name, is_dir, size in scandir(path / rel):
+        yield rel / name, is_dir, size
+        if is_dir:
+            yield from walk_dir(path, rel / name)
+
+
+def kind(path: Path) -> str:
+    "Return 'dir', 'file' or 'missing' for `path` from a single stat() call."
+    try:
+        mode = path.stat().st_mode
+    except FileNotFoundError:
+        return "missing"
+    return "dir" if stat.S_ISDIR(mode) else "file" if stat.S_ISREG(mode) else "other"
 
 
 def check_folders(src: Path, dest: Path) -> None:
-    local = sorted(f for f in ls_dir(src) if f.is_file())
-    remote = sorted(f for f in ls_dir(dest) if f.is_file())
-    assert [f.as_posix() for f in local] == [f.as_posix() for f in remote]
-    assert [f.stat().st_size for f in local] == [f.stat().st_size for f in remote]
-    for s, d in zip(local, remote):
-        print(s.as_posix())
-        assert s.read_bytes() == d.read_bytes()
+    local = sorted((f, size) for f, is_dir, size in walk_dir(src) if not is_dir)
+    remote = sorted((f, size) for f, is_dir, size in walk_dir(dest) if not is_dir)
+    assert local, f"No files found in {src}"
+    assert [f.as_posix() for f, _ in local] == [f.as_posix() for f, _ in remote]
+    assert [size for _, size in local] == [size for _, size in remote]
+    for f, _ in local:
+        print(f.as_posix())
+        assert (src / f).read_bytes() == (dest / f).read_bytes()
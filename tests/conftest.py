@@ -1,21 +1,21 @@
 import argparse
 import logging.config
 import os
+import shutil
 from contextlib import suppress
 from pathlib import Path
 from typing import Generator
 
 import pytest
-import yaml
 from mpremote.transport_serial import TransportError
 
 from mpremote_path import MPRemotePath as MPath
+from mpremote_path.util import mpfsops
 
 test_dir = "/_tests"  # Directory to create for tests on the micropython board.
+board_data_dir = "/_tests_data"  # Copy of the test data on the board.
 data_dir = "tests/_data"  # Local directory containing test data files.
-
-
-logging.config.dictConfig(yaml.safe_load(Path("tests/logging.yaml").read_text()))
+ramdisk = Path("/dev/shm")  # Keep local test files in memory if available.
 
 
 def pytest_addoption(parser: argparse.Namespace) -> None:
@@ -24,7 +24,8 @@ def pytest_addoption(parser: argparse.Namespace) -> None:
         dest="port",
         action="store",
         default="/dev/ttyUSB0",
-        help="Serial port for micropython board: /dev/ttyUSB0",
+        help="Serial port for micropython board: /dev/ttyUSB0 (a comma separated"
+        " list gives each pytest-xdist worker its own board)",
     )
     parser.addoption(
         "--baud",
@@ -44,71 +45,203 @@ def pytest_addoption(parser: argparse.Namespace) -> None:
         action="store_true",
         help="Whether to use UTC for board clock: False",
     )
+    parser.addoption(
+        "--no-cwd-cache",
+        dest="cwd_cache",
+        action="store_false",
+        help="Ask the board for the working directory in each test fixture",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    "Put pytest's temporary directories on the ramdisk (unless --basetemp)."
+    if config.option.basetemp is None and ramdisk.is_dir():
+        config.option.basetemp = ramdisk / f"mpremote-path-{os.getpid()}"
+    config.addinivalue_line("markers", "board: test uses the micropython board")
+    config.addinivalue_line("markers", "xdist_group(name): pytest-xdist group")
+
+
+# Tests which use the board must run one at a time on a single connection. With
+# pytest-xdist, run with `-n auto --dist loadgroup` to send all the board tests
+# to one worker while the local-only tests run in parallel on the others. With
+# one board per worker (eg. `--port /dev/ttyUSB0,/dev/ttyUSB1 -n 2`) the board
+# tests are spread across all the workers instead.
+board_fixtures = {"root", "testdir", "testfolder"}
+
+
+def board_port(config: pytest.Config) -> str:
+    "Return the serial port of the board for this (pytest-xdist) worker."
+    ports = config.option.port.split(",")
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")  # eg. "gw1"
+    return ports[int(worker[2:]) % len(ports)]
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    "Mark the tests which use the board and put them in one xdist group."
+    shared_board = "," not in config.option.port
+    for item in items:
+        if board_fixtures.intersection(getattr(item, "fixturenames", ())):
+            item.add_marker(pytest.mark.board)
+            if shared_board:
+                item.add_marker(pytest.mark.xdist_group("board"))
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    basetemp = config.option.basetemp
+    if basetemp is not None and Path(basetemp).parent == ramdisk:
+        shutil.rmtree(basetemp, ignore_errors=True)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def logging_config(pytestconfig: pytest.Config) -> None:
+    """Configure logging once for the test session. The parsed config is kept in
+    the pytest cache (if enabled) and only re-read when logging.yaml changes."""
+    file = Path("tests/logging.yaml")
+    key, mtime = "mpremote-path/logging", file.stat().st_mtime
+    cache = getattr(pytestconfig, "cache", None)  # None with -p no:cacheprovider
+    cached = cache.get(key, None) if cache else None
+    if cached and cached.get("mtime") == mtime:
+        config = cached["config"]
+    else:
+        import yaml  # Only needed here: keep it out of test collection
+
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        config = yaml.load(file.read_text(), Loader=loader)
+        if cache:
+            cache.set(key, {"mtime": mtime, "config": config})
+    logging.config.dictConfig(config)
+
+
+# The board working directory as last set by the test fixtures. Every test
+# fixture restores the working directory on teardown, so this is valid at the
+# start of each test and saves asking the board for it.
+_board_cwd: dict[str, MPath] = {}
+
+
+def chdir(path: MPath) -> None:
+    "Change the working directory on the board and remember it."
+    path.chdir()
+    _board_cwd["cwd"] = path
+
+
+def getcwd(pytestconfig: pytest.Config) -> MPath:
+    "Return the board working directory saved by `chdir()`."
+    if pytestconfig.option.cwd_cache and "cwd" in _board_cwd:
+        return _board_cwd["cwd"]
+    return MPath.cwd()
+
+
+# Test directories on the board which are known to have been removed: saves a
+# round-trip to clean up before creating the test folder for each test.
+_removed: set[str] = set()
 
 
 def rm_recursive(path: Path) -> None:
     """Remove a directory and all it's contents recursively."""
-    if not path.exists():
-        return
+    if isinstance(path, MPath):
+        # One round-trip to the board, including the exists() check
+        mpfsops.rm_tree_remote(path, verbose=False, missing_ok=True)
     elif path.is_dir():
-        for child in path.iterdir():
-            rm_recursive(child)
-        path.rmdir()
-    elif path.is_file():
+        shutil.rmtree(path)
+    elif path.exists():
         path.unlink()
-    else:
-        raise ValueError(f"{path} is not a directory or file")
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def root(pytestconfig: argparse.Namespace) -> Generator[MPath, None, None]:
+    "Connect to the board and cd to the root folder once for the test session."
     if not hasattr(MPath, "board"):
         MPath.connect(
-            pytestconfig.option.port,
+            board_port(pytestconfig),
             baud=pytestconfig.option.baud,
             set_clock=pytestconfig.option.sync,
             utc=pytestconfig.option.utc,
         )
         # MPath.board.soft_reset()
-        rm_recursive(MPath(test_dir))  # Clean up after previous test runs
+    rm_recursive(MPath(test_dir))  # Clean up after previous test runs
+    _removed.add(test_dir)
     path, pwd = MPath("/"), MPath.cwd()
-    path.chdir()
+    chdir(path)
     yield path
     pwd.chdir()
+    _board_cwd.clear()
 
 
 @pytest.fixture()
-def testdir(root: MPath) -> Generator[MPath, None, None]:
-    path, pwd = MPath(test_dir), MPath.cwd()
+def testdir(root: MPath, pytestconfig: pytest.Config) -> Generator[MPath, None, None]:
+    path, pwd = MPath(test_dir), getcwd(pytestconfig)
+    _removed.discard(test_dir)  # The test may leave the directory behind
     yield path
     if pwd:  # Restore the previous working directory and cleanup
-        pwd.chdir()
+        chdir(pwd)
 
 
 @pytest.fixture()
-def testfolder(root: MPath) -> Generator[MPath, None, None]:
+def testfolder(
+    root: MPath, pytestconfig: pytest.Config
+) -> Generator[MPath, None, None]:
     "Create a test folder on the board and cd into it."
-    path, pwd = MPath(test_dir), MPath.cwd()
+    path, pwd = MPath(test_dir), getcwd(pytestconfig)
     if path in (pwd, *pwd.parents):
-        MPath("/").chdir()
-    rm_recursive(path)
+        chdir(root)
+    if test_dir not in _removed:
+        rm_recursive(path)
+    _removed.discard(test_dir)
     with suppress(TransportError, OSError):
         path.mkdir()
-    path.chdir()
+    chdir(path)
     try:
         yield path
     finally:
-        pwd.chdir()
+        chdir(pwd)
+    with suppress(TransportError, OSError):
+        rm_recursive(path)
+        _removed.add(test_dir)
+
+
+@pytest.fixture(scope="session")
+def board_data(root: MPath, localdata_dir: Path) -> Generator[MPath, None, None]:
+    "Upload the local test data files to the board once for the test session."
+    path = MPath(board_data_dir)
+    rm_recursive(path)
+    mpfsops.rcopy(localdata_dir / "src", path)
+    yield path
     with suppress(TransportError, OSError):
         rm_recursive(path)
 
 
 @pytest.fixture()
-def localdata() -> Generator[Path, None, None]:
+def board_src(testfolder: MPath, localdata: Path, board_data: MPath) -> MPath:
+    """Copy the test data files into "src" in the test folder, using code on the
+    board rather than sending the files over the serial link again."""
+    path = testfolder / "src"
+    mpfsops.cp_tree_remote(board_data, path, verbose=False)
+    return path
+
+
+@pytest.fixture()
+def stat_cache(root: MPath) -> Generator[None, None, None]:
+    """Cache stat() results (including missing files) on the board for the test.
+    The cache is cleared whenever files on the board are changed."""
+    with root.board.stat_cache():
+        yield
+
+
+@pytest.fixture(scope="session")
+def localdata_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    "Copy the local data files to the (ramdisk) temp dir once per session."
+    path = tmp_path_factory.getbasetemp() / "_data"
+    shutil.copytree(data_dir, path, dirs_exist_ok=True)
+    return path
+
+
+@pytest.fixture()
+def localdata(localdata_dir: Path) -> Generator[Path, None, None]:
     "Change to the local data directory."
     pwd = os.getcwd()
-    os.chdir(data_dir)
-    rm_recursive(Path("test2"))
+    os.chdir(localdata_dir)
     try:
         yield Path.cwd()
     finally:
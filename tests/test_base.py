@@ -1,5 +1,7 @@
+import os
 import stat
 from shutil import SameFileError
+from typing import Optional, Tuple
 
 import pytest
 
@@ -7,7 +9,9 @@ from mpremote_path import MPRemotePath as MPath
 
 # The `root` fixture saves the current working directory, cd's to the root
 # folder and passes in the path of the root directory of the micropython board.
-# The original working directory will be restored when the fixture is torn down.
+# It is set up once for the test session: the original working directory will
+# be restored at the end of the session. Tests must not leave the board in
+# another directory (the `testdir` and `testfolder` fixtures restore it).
 
 # The `testdir` fixture passes in a directory for testing without creating the
 # directory.
@@ -17,14 +21,21 @@ from mpremote_path import MPRemotePath as MPath
 # test fixture is torn down.
 
 
+def _snap(p: MPath) -> Tuple[bool, bool, bool, Optional[os.stat_result]]:
+    "Return (exists, is_dir, is_file, stat) for `p` from a single stat() call."
+    try:
+        s = p.stat()
+    except FileNotFoundError:
+        return (False, False, False, None)
+    return (True, stat.S_ISDIR(s.st_mode), stat.S_ISREG(s.st_mode), s)
+
+
 def test_root_folder(root: MPath):
     """Test the RemotePath class."""
     p = MPath("/")
-    assert p.exists() is True
-    assert len(list(p.stat())) == 10
-    assert stat.S_ISDIR(p.stat().st_mode) is True
-    assert p.is_dir() is True
-    assert p.is_file() is False
+    *snap, st = _snap(p)
+    assert snap == [True, True, False]
+    assert st is not None and len(list(st)) == 10
     assert p.is_mount() is False
     assert p.is_symlink() is False
     assert p.is_block_device() is False
@@ -42,13 +53,27 @@ def test_mkdir(testdir: MPath) -> None:
     p = testdir
     assert p.exists() is False
     p.mkdir()
-    assert p.exists() is True
-    assert stat.S_ISDIR(p.stat().st_mode) is True
-    assert (p.is_dir(), p.is_file()) == (True, False)
+    assert _snap(p)[:3] == (True, True, False)
     p.rmdir()
     assert p.exists() is False
 
 
+def test_mkdir_parents(testfolder: MPath, stat_cache: None) -> None:
+    "Test creating directories with missing parents"
+    p = MPath("dir1/dir2/dir3")
+    parents = [p, p.parent, p.parent.parent]
+    with pytest.raises(FileNotFoundError):
+        p.mkdir()
+    p.mkdir(parents=True)
+    assert [_snap(q)[:3] for q in parents] == [(True, True, False)] * 3
+    with pytest.raises(FileExistsError):
+        p.mkdir()
+    p.mkdir(parents=True, exist_ok=True)
+    for q in parents:
+        q.rmdir()
+    assert not any(q.exists() for q in parents)
+
+
 def test_cd(testdir: MPath) -> None:
     "Test changing directories"
     p = testdir
@@ -63,70 +88,124 @@ def test_cd(testdir: MPath) -> None:
     assert p.exists() is False
 
 
-def test_touch_unlink(testfolder: MPath) -> None:
+def test_touch_unlink(testfolder: MPath, stat_cache: None) -> None:
     "Test creating and deleting files"
     p = MPath("test1.touch")
     assert p.exists() is False
     p.touch()
-    assert p.exists() is True
-    assert stat.S_ISREG(p.stat().st_mode) is True
-    assert (p.exists(), p.is_dir(), p.is_file()) == (True, False, True)
-    assert p.stat().st_size == 0
+    *snap, st = _snap(p)
+    assert snap == [True, False, True]
+    assert st is not None and st.st_size == 0
     p.unlink()
     assert p.exists() is False
 
 
-def test_rename_replace(testfolder: MPath) -> None:
+def test_rename_replace(testfolder: MPath, stat_cache: None) -> None:
     "Test renaming files"
     p = MPath("test1.touch")
     p.touch()
-    assert p.exists() and p.is_file()
+    assert _snap(p)[:3] == (True, False, True)
     q = p.rename("test2.touch")
-    assert q.exists() and q.is_file()
+    assert _snap(q)[:3] == (True, False, True)
     assert p.exists() is False
     p = q.replace("test3.touch")
-    assert p.exists() and p.is_file()
+    assert _snap(p)[:3] == (True, False, True)
     assert q.exists() is False
     p.unlink()
     assert p.exists() is False
 
 
-def test_read_write_bytes(testfolder: MPath) -> None:
+def test_stat_cache(testfolder: MPath) -> None:
+    "Test the stat cache is cleared when files are changed"
+    p = MPath("test1.touch")
+    with p.board.stat_cache():
+        assert p.exists() is False
+        assert MPath("test1.touch").exists() is False
+        p.touch()
+        assert MPath("test1.touch").exists() is True
+        MPath("test1.touch").unlink()
+        assert MPath("test1.touch").exists() is False
+
+
+def test_cwd_cache(testfolder: MPath) -> None:
+    "Test the cached working directory is updated by chdir()"
+    p = MPath("dir1")
+    p.mkdir()
+    with p.board.stat_cache():
+        assert MPath.cwd().as_posix() == testfolder.as_posix()
+        p.chdir()
+        assert MPath.cwd().as_posix() == (testfolder / "dir1").as_posix()
+        testfolder.chdir()
+        assert MPath.cwd().as_posix() == testfolder.as_posix()
+    p.rmdir()
+
+
+def test_read_write_bytes(testfolder: MPath, stat_cache: None) -> None:
     "Test reading and writing bytes to/from files"
     p = MPath("test1.bytes")
     assert p.exists() is False
     msg = b"Hello world\n"
     p.write_bytes(msg)
-    assert (p.exists(), p.is_dir(), p.is_file()) == (True, False, True)
-    assert p.stat().st_size == len(msg)
+    *snap, st = _snap(p)
+    assert snap == [True, False, True]
+    assert st is not None and st.st_size == len(msg)
     msg2 = p.read_bytes()
     assert msg2 == msg
     p.unlink()
     assert p.exists() is False
 
 
-def test_read_write_text(testfolder: MPath) -> None:
+def test_read_write_text(testfolder: MPath, stat_cache: None) -> None:
     "Test reading and writing unicode strings to/from files"
     p = MPath("test1.text")
     assert p.exists() is False
     msg = "Hello world\n"
     p.write_text(msg)
-    assert p.stat().st_size == len(msg)
+    *snap, st = _snap(p)
+    assert snap == [True, False, True]
+    assert st is not None and st.st_size == len(msg)
     msg2 = p.read_text()
     assert msg2 == msg
     p.unlink()
     assert p.exists() is False
 
 
+def test_read_missing(testfolder: MPath) -> None:
+    "Test reading a missing file raises FileNotFoundError"
+    p = MPath("missing.txt")
+    with pytest.raises(FileNotFoundError):
+        p.read_text()
+    with pytest.raises(FileNotFoundError):
+        p.read_bytes()
+    with pytest.raises(FileNotFoundError):
+        list(p.read_chunks())
+
+
+def test_read_write_chunks(testfolder: MPath) -> None:
+    "Test streaming bytes to/from files in chunks"
+    p = MPath("test1.bytes")
+    chunks = [bytes([i]) * 100 for i in range(100)]  # Coalesced into larger writes
+    assert p.write_chunks(chunks) == 10000
+    assert b"".join(p.read_chunks(4096)) == b"".join(chunks)
+    assert [len(c) for c in p.read_chunks(4096)] == [4096, 4096, 1808]
+    reader = p.read_chunks(100)
+    assert next(reader) == chunks[0]
+    reader.close()  # Stop reading early: closes the file on the board
+    assert p.read_bytes() == b"".join(chunks)
+    p.unlink()
+
+
 def test_resolve_samefile(root: MPath) -> None:
     "Test resolving paths: absolute(), and resolve()"
     q = MPath("./lib/mpy")
     q = q / "../.././main.py"
     assert q.as_posix() == "lib/mpy/../../main.py"
-    assert q.absolute().as_posix() == "/lib/mpy/../../main.py"
-    assert q.absolute().resolve().as_posix() == "/main.py"
-    assert q.samefile(q.absolute()) is True
-    assert q.samefile(q.absolute().resolve()) is True
+    abs_q = q.absolute()  # Each call to absolute() fetches the cwd
+    res_q = abs_q.resolve()
+    assert abs_q.as_posix() == "/lib/mpy/../../main.py"
+    assert res_q.as_posix() == "/main.py"
+    assert q.samefile(abs_q) is True
+    assert q.samefile(res_q) is True
 
 
 def test_copy_copyfile(testfolder: MPath) -> None:
@@ -151,61 +230,62 @@ def test_copy_copyfile(testfolder: MPath) -> None:
     p.unlink()
 
 
-def test_open_bytes(testfolder: MPath) -> None:
+def test_copyfile_missing(testfolder: MPath) -> None:
+    "Test copying a missing file, or into a missing folder, raises OSError"
+    p = MPath("test1.touch")
+    with pytest.raises(FileNotFoundError):
+        p.copyfile("test2.touch")
+    p.write_text("Hello world\n")
+    with pytest.raises(FileNotFoundError):
+        p.copyfile("missing/test2.touch")
+    p.unlink()
+
+
+def test_open_bytes(testfolder: MPath, stat_cache: None) -> None:
     "Test reading and writing bytes to/from files"
     p = MPath("test1.bytes")
     assert p.exists() is False
     msg = b"Hello world\n"
-    f = p.open("wb")
-    f.write(msg)
-    f.close()
-    assert (p.exists(), p.is_dir(), p.is_file()) == (True, False, True)
-    assert p.stat().st_size == len(msg)
-    msg2 = p.read_bytes()
+    with p.open("wb") as f:
+        f.write(msg)
+    *snap, st = _snap(p)
+    assert snap == [True, False, True]
+    assert st is not None and st.st_size == len(msg)
+    with p.open("rb") as f2:
+        msg2 = f2.read()
     assert msg2 == msg
-    f = p.open("rb")
-    msg3 = f.read()
-    f.close()
-    assert msg3 == msg
     p.unlink()
     assert p.exists() is False
 
 
-def test_open_text(testfolder: MPath) -> None:
+def test_open_text(testfolder: MPath, stat_cache: None) -> None:
     "Test reading and writing bytes to/from files"
     p = MPath("test1.text")
     assert p.exists() is False
     msg = "Hello world\n"
-    f = p.open("w", newline="")  # Preserve unix newlines on Windows
-    f.write(msg)
-    f.close()
-    assert (p.exists(), p.is_dir(), p.is_file()) == (True, False, True)
-    msg2 = p.read_text()
+    with p.open("w", newline="") as f:  # Preserve unix newlines on Windows
+        f.write(msg)
+    assert _snap(p)[:3] == (True, False, True)
+    with p.open("r") as f2:
+        msg2 = f2.read()
     assert msg2 == msg
-    f = p.open("r")
-    msg3 = f.read()
-    f.close()
-    assert msg3 == msg
     p.unlink()
     assert p.exists() is False
 
 
-def test_not_implemented(testfolder: MPath) -> None:
-    "Test methods that are not implemented."
+@pytest.mark.parametrize(
+    "method,args",
+    [
+        ("chmod", (0o777,)),  # No groups or other permissions on lfs or fat
+        ("lchmod", (0o777,)),  # No groups or other permissions on lfs or fat
+        ("readlink", ()),  # No links on lfs or fat
+        ("symlink_to", ("test2.touch",)),  # No links on lfs or fat
+        ("hardlink_to", ("test2.touch",)),  # No links on lfs or fat
+        ("link_to", ("test2.touch",)),  # No links on lfs or fat
+    ],
+)
+def test_not_implemented(root: MPath, method: str, args: tuple) -> None:
+    "Test methods that are not implemented (these never touch the board)."
     p = MPath("test1.touch")
-    assert p.exists() is False
-    p.touch()  # Create a temp file for the following tests
-    assert p.exists() is True
-    with pytest.raises(NotImplementedError):
-        p.chmod(0o777)  # No groups or other permissions on lfs or fat
-    with pytest.raises(NotImplementedError):
-        p.lchmod(0o777)  # No groups or other permissions on lfs or fat
     with pytest.raises(NotImplementedError):
-        p.readlink()  # No links on lfs or fat
-    with pytest.raises(NotImplementedError):
-        p.symlink_to("test2.touch")  # No links on lfs or fat
-    with pytest.raises(NotImplementedError):
-        p.hardlink_to("test2.touch")  # No links on lfs or fat
-    with pytest.raises(NotImplementedError):
-        p.link_to("test2.touch")  # No links on lfs or fat
-    p.unlink()
+        getattr(p, method)(*args)
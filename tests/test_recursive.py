@@ -1,12 +1,13 @@
-import itertools
+import hashlib
 from pathlib import Path
-from typing import Iterable
 
 from mpremote_path import MPRemotePath as MPath
+from mpremote_path.util import mpfsops
 
 
 def copy_recursive(src: Path, dst: Path) -> None:
-    """Copy a file or directory recursively."""
+    """Copy a file or directory recursively. Files are streamed in chunks by
+    `mpfsops.copyfile()`, so only one chunk of a file is in memory at a time."""
     if src.is_dir():
         print(f"{src}/ -> {dst}/")
         dst.mkdir()
@@ -14,21 +15,22 @@ def copy_recursive(src: Path, dst: Path) -> None:
             copy_recursive(child, dst / child.name)
     elif src.is_file():
         print(f"{src} -> {dst}")
-        dst.write_bytes(src.read_bytes())
+        mpfsops.copyfile(src, dst)
     else:
         print(f"Skipping {src}")
 
 
-def ls_dir(path: Path) -> Iterable[Path]:
-    """List all the files and dirs recursively."""
-    if path.is_dir():
-        return itertools.chain(
-            (child for child in path.iterdir()),
-            itertools.chain.from_iterable(
-                ls_dir(child) for child in path.iterdir() if child.is_dir()
-            ),
-        )
-    raise ValueError(f"{path} is not a directory")
+def _digest(path: Path, chunk_size: int = 4096) -> bytes:
+    "Return the sha256 digest of a file, reading it in chunks."
+    h = hashlib.sha256()
+    if isinstance(path, MPath):
+        for chunk in path.read_chunks(chunk_size):
+            h.update(chunk)
+    else:
+        with path.open("rb") as f:
+            while chunk := f.read(chunk_size):
+                h.update(chunk)
+    return h.digest()
 
 
 def rm_recursive(path: Path) -> None:
@@ -44,25 +46,24 @@ def rm_recursive(path: Path) -> None:
         raise ValueError(f"{path} is not a directory or file")
 
 
-def test_recursive_copy(testfolder: MPath, localdata: Path) -> None:
+def test_recursive_copy(testfolder: MPath, localdata: Path, stat_cache: None) -> None:
     "Test recursively copying local files to the micropython board."
     src, dest = Path("./src"), MPath("./src")
     assert (src.exists(), dest.exists()) == (True, False)
-    copy_recursive(src, dest)
-    local = sorted([f for f in ls_dir(src) if f.is_file()])
-    files = sorted([f for f in ls_dir(dest) if f.is_file()])
+    with mpfsops.raw_repl():  # Enter the raw repl once for all the files
+        copy_recursive(src, dest)
+    local = sorted(f for f in src.rglob("*") if f.is_file())
+    files = sorted(f for f in dest.rglob("*") if f.is_file())
     assert [f.as_posix() for f in local] == [f.as_posix() for f in files]
     assert [f.stat().st_size for f in local] == [f.stat().st_size for f in files]
-    for s, d in zip(local, files):
-        print(s.as_posix())
-        assert s.read_bytes() == d.read_bytes()
+    for f in local:
+        print(f.as_posix())
+        assert _digest(f) == _digest(dest / f.relative_to(src))
 
 
-def test_glob_rglob(testfolder: MPath, localdata: Path) -> None:
+def test_glob_rglob(testfolder: MPath, board_src: MPath) -> None:
     "Test glob methods."
     src, dest = Path("./src"), MPath("./src")
-    assert (src.exists(), dest.exists()) == (True, False)
-    copy_recursive(src, dest)
     assert sorted([f.as_posix() for f in (src / "ota").glob("*.py")]) == sorted(
         [f.as_posix() for f in (dest / "ota").glob("*.py")]
     )
@@ -1,5 +1,7 @@
 from pathlib import Path
+from typing import Iterable, Iterator
 
+import pytest
 from common import check_folders
 
 from mpremote_path import MPRemotePath as MPath
@@ -7,7 +9,9 @@ from mpremote_path.util import mpfs as fscmd
 
 # The `root` fixture saves the current working directory, cd's to the root
 # folder and passes in the path of the root directory of the micropython board.
-# The original working directory will be restored when the fixture is torn down.
+# It is set up once for the test session: the original working directory will
+# be restored at the end of the session. Tests must not leave the board in
+# another directory (the `testdir` and `testfolder` fixtures restore it).
 
 # The `testfolder` fixture creates a directory on the board for running tests
 # and passes in the path of the directory. The folder will be deleted when the
@@ -62,6 +66,13 @@ def test_cd_cwd(testfolder: MPath) -> None:
     )
 
 
+def test_root_glob(testfolder: MPath) -> None:
+    "Test an absolute glob in the root folder from another folder"
+    fscmd.touch("test1.file")
+    files = list(fscmd.remote_path_list("/*"))
+    assert {p.as_posix() for p in files} == {p.as_posix() for p in MPath("/").iterdir()}
+
+
 def test_cp_file(testfolder: MPath) -> None:
     "Test make a copy of a file onm the board."
     src, dst = "test1.file", "test2.file"
@@ -76,6 +87,12 @@ def test_cp_file(testfolder: MPath) -> None:
     assert q.read_text() == msg
 
 
+def test_cp_dir(testfolder: MPath, board_src: MPath) -> None:
+    "Test make a copy of a directory on the board."
+    fscmd.cp("src", "src2")
+    check_folders(MPath("src"), MPath("src2"))
+
+
 def test_put_file(testfolder: MPath, localdata: Path) -> None:
     "Test copy file to board"
     src, dst = "./src/ota/status.py", "./status2.py"
@@ -91,6 +108,38 @@ def test_put_dir(testfolder: MPath, localdata: Path) -> None:
     check_folders(p, MPath(dst) / p.name)
 
 
+@pytest.mark.parametrize("chunk_size", [512, 4096, 32768])
+def test_put_get_chunk_size(
+    testfolder: MPath, localdata: Path, chunk_size: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    "Test copying files to and from the board in different sized chunks."
+    src, dst, dst2 = "src", ".", "test2"
+    sizes = [f.stat().st_size for f in Path(src).rglob("*") if f.is_file()]
+    chunks: list[int] = []  # The size of each chunk written to the board
+    board = MPath.board
+    writefile_chunks = board.fs_writefile_chunks
+
+    def counted(data: Iterable[bytes]) -> Iterator[bytes]:
+        for d in data:
+            chunks.append(len(d))
+            yield d
+
+    def spy(filename: str, data: Iterable[bytes], size: int) -> int:
+        assert size == chunk_size
+        return writefile_chunks(filename, counted(data), size)
+
+    monkeypatch.setattr(board, "fs_writefile_chunks", spy)
+    fscmd.put(src, dst, chunk_size=chunk_size)
+    monkeypatch.undo()
+    check_folders(Path(src), MPath(src))
+    assert max(chunks) <= chunk_size and sum(chunks) == sum(sizes)
+    assert len(chunks) == sum(-(-size // chunk_size) for size in sizes)
+    q = Path(dst2)
+    q.mkdir()
+    fscmd.get(src, dst2, chunk_size=chunk_size)
+    check_folders(MPath(src), q / src)
+
+
 def test_put_glob(testfolder: MPath, localdata: Path) -> None:
     "Test copy file by globbing to board"
     src, dst = "./src/ota/*.py", "."
@@ -109,20 +158,18 @@ def test_get_file(testfolder: MPath, localdata: Path) -> None:
     assert Path(dst).read_text() == MPath(src).read_text()
 
 
-def test_get_dir(testfolder: MPath, localdata: Path) -> None:
+def test_get_dir(testfolder: MPath, board_src: MPath) -> None:
     "Test copy directory and contents from board"
-    src, dst, dst2 = "src", ".", "test2"
-    fscmd.put(src, dst)
+    src, dst2 = "src", "test2"
     q = Path(dst2)
     q.mkdir()
     fscmd.get(src, dst2)
     check_folders(MPath(src), q / src)
 
 
-def test_get_glob(testfolder: MPath, localdata: Path) -> None:
+def test_get_glob(testfolder: MPath, board_src: MPath) -> None:
     "Test copy file globs from board"
-    src, dst, dst2 = "src", ".", "test2"
-    fscmd.put(src, dst)
+    dst2 = "test2"
     q = Path(dst2)
     q.mkdir()
     fscmd.get("src/ota/*.py", dst2)
@@ -1,13 +1,16 @@
 from pathlib import Path
 
-from common import check_folders
+import pytest
+from common import check_folders, kind
 
 from mpremote_path import MPRemotePath as MPath
 from mpremote_path.util import mpfsops
 
 # The `root` fixture saves the current working directory, cd's to the root
 # folder and passes in the path of the root directory of the micropython board.
-# The original working directory will be restored when the fixture is torn down.
+# It is set up once for the test session: the original working directory will
+# be restored at the end of the session. Tests must not leave the board in
+# another directory (the `testdir` and `testfolder` fixtures restore it).
 
 # The `testdir` fixture passes in a directory for testing without creating the
 # directory.
@@ -39,12 +42,19 @@ def test_copyfile(testfolder: MPath, localdata: Path) -> None:
         f.unlink()  # Clean up
 
 
+def test_copyfile_missing_dir(testfolder: MPath, localdata: Path) -> None:
+    "Test copying a file into a missing folder on the board."
+    src, dest = Path("./src/ota/status.py"), MPath("missing/status.py")
+    with pytest.raises(FileNotFoundError):
+        mpfsops.copyfile(src, dest)
+
+
 def test_copypath(testfolder: MPath, localdata: Path) -> None:
     "Test recursively copying a local file/dir to the micropython board."
     src, dest = Path("./src"), MPath("./src")
     assert (src.exists(), dest.exists()) == (True, False)
     mpfsops.copypath(src, dest)
-    assert (dest.exists(), dest.is_dir(), dest.is_file()) == (True, True, False)
+    assert kind(dest) == "dir"
 
 
 def test_rcopy(testfolder: MPath, localdata: Path) -> None:
@@ -52,7 +62,15 @@ def test_rcopy(testfolder: MPath, localdata: Path) -> None:
     src, dest = Path("./src"), MPath("./src2")
     assert (src.exists(), dest.exists()) == (True, False)
     mpfsops.rcopy(src, dest)
-    assert (dest.exists(), dest.is_dir(), dest.is_file()) == (True, True, False)
+    assert kind(dest) == "dir"
+
+
+def test_rcopy_local(localdata: Path) -> None:
+    "Test recursively copying local files/dirs to a local directory."
+    src, dest = Path("./src"), Path("./test2")
+    assert (src.exists(), dest.exists()) == (True, False)
+    mpfsops.rcopy(src, dest)
+    check_folders(src, dest)
 
 
 def test_copy_file(testfolder: MPath, localdata: Path) -> None:
@@ -60,7 +78,7 @@ def test_copy_file(testfolder: MPath, localdata: Path) -> None:
     src, dest = Path("./src/ota/status.py"), MPath("status.py")
     assert (src.exists(), dest.exists()) == (True, False)
     mpfsops.copy([src], dest)
-    assert (dest.exists(), dest.is_dir(), dest.is_file()) == (True, False, True)
+    assert kind(dest) == "file"
 
 
 def test_copy_folder(testfolder: MPath, localdata: Path) -> None:
@@ -71,45 +89,126 @@ def test_copy_folder(testfolder: MPath, localdata: Path) -> None:
     check_folders(src, dest / src.name)
 
 
-def test_remove_file(testfolder: MPath, localdata: Path) -> None:
+def test_remove_file(testfolder: MPath, localdata: Path, stat_cache: None) -> None:
     "Test deleting files on board."
     src, dest = Path("./src/ota/status.py"), MPath("status.py")
     assert (src.exists(), dest.exists()) == (True, False)
     mpfsops.copy([src], dest)
-    assert (dest.exists(), dest.is_dir(), dest.is_file()) == (True, False, True)
+    assert kind(dest) == "file"
     mpfsops.remove([dest])
-    assert (dest.exists(), dest.is_dir(), dest.is_file()) == (False, False, False)
+    assert kind(dest) == "missing"
 
 
-def test_remove_folder(testfolder: MPath, localdata: Path) -> None:
+def test_remove_folder(testfolder: MPath, localdata: Path, stat_cache: None) -> None:
     "Test deleting folders on board."
     src, dest = Path("./src"), MPath("./src2")
     assert (src.exists(), dest.exists()) == (True, False)
     mpfsops.rcopy(src, dest)
-    assert (dest.exists(), dest.is_dir(), dest.is_file()) == (True, True, False)
+    assert kind(dest) == "dir"
     mpfsops.remove([dest], recursive=True)
-    assert (dest.exists(), dest.is_dir(), dest.is_file()) == (False, False, False)
+    assert kind(dest) == "missing"
+
+
+def test_cp_tree_remote(testfolder: MPath, board_src: MPath) -> None:
+    "Test copying folders on the board in a single round-trip."
+    src, dest = MPath("./src"), MPath("./src2")
+    with mpfsops.stat_cache():
+        assert not (dest / "ota").exists()  # Cache a missing file
+        mpfsops.cp_tree_remote(src, dest, verbose=False)
+        assert kind(dest / "ota") == "dir"
+    check_folders(src, dest)
+    with pytest.raises(FileNotFoundError):
+        mpfsops.cp_tree_remote(MPath("missing"), dest, verbose=False)
+
+
+def test_rm_tree_remote(testfolder: MPath, localdata: Path) -> None:
+    "Test deleting folders on board in a single round-trip."
+    src, dest = Path("./src"), MPath("./src2")
+    mpfsops.rcopy(src, dest)
+    assert dest.is_dir()
+    mpfsops.rm_tree_remote(dest, verbose=False, missing_ok=True)
+    assert not dest.exists()
+    mpfsops.rm_tree_remote(dest, verbose=False, missing_ok=True)
+    assert not dest.exists()
+    with pytest.raises(FileNotFoundError):
+        mpfsops.rm_tree_remote(dest, verbose=False)
 
 
-def test_move_file(testfolder: MPath, localdata: Path) -> None:
+def test_move_file(testfolder: MPath, localdata: Path, stat_cache: None) -> None:
     "Test renaming files on the board."
     src, dest = Path("./src/ota/status.py"), MPath("status.py")
     assert (src.exists(), dest.exists()) == (True, False)
     mpfsops.copy([src], dest)
-    assert (dest.exists(), dest.is_dir(), dest.is_file()) == (True, False, True)
+    assert kind(dest) == "file"
     dest2 = MPath("status2.py")
     mpfsops.move([dest], dest2)
-    assert (dest.exists(), dest.is_dir(), dest.is_file()) == (False, False, False)
-    assert (dest2.exists(), dest2.is_dir(), dest2.is_file()) == (True, False, True)
+    assert kind(dest) == "missing"
+    assert kind(dest2) == "file"
 
 
-def test_move_folder(testfolder: MPath, localdata: Path) -> None:
+def test_move_folder(testfolder: MPath, localdata: Path, stat_cache: None) -> None:
     "Test renaming folders on the board."
     src, dest = Path("./src"), MPath("src")
     assert (src.exists(), dest.exists()) == (True, False)
     mpfsops.rcopy(src, dest)
-    assert (dest.exists(), dest.is_dir(), dest.is_file()) == (True, True, False)
+    assert kind(dest) == "dir"
     dest2 = MPath("src2")
     mpfsops.move([dest], dest2)
-    assert (dest.exists(), dest.is_dir(), dest.is_file()) == (False, False, False)
-    assert (dest2.exists(), dest2.is_dir(), dest2.is_file()) == (True, True, False)
+    assert kind(dest) == "missing"
+    assert kind(dest2) == "dir"
+
+
+def test_listdir_stat(testfolder: MPath, localdata: Path) -> None:
+    "Test listing a directory on the board with stat info for each file."
+    src, dest = Path("./src/ota"), MPath("ota")
+    mpfsops.rcopy(src, dest)
+    files = {name: (size, mode) for name, size, _, mode in mpfsops.listdir_stat(dest)}
+    assert sorted(files) == sorted(f.name for f in src.iterdir())
+    for f in mpfsops.iterdir_stat(dest):
+        assert files[f.name] == (f.stat().st_size, f.stat().st_mode)
+        assert f.stat().st_mtime == MPath(f).stat().st_mtime
+
+
+def test_tree_stat(testfolder: MPath, localdata: Path) -> None:
+    "Test listing a directory tree on the board in one round-trip."
+    src, dest = Path("./src"), MPath("src")
+    mpfsops.rcopy(src, dest)
+    files = mpfsops.tree_stat(dest)
+    assert sorted(f.relative_to(dest).as_posix() for f in files) == sorted(
+        f.relative_to(src).as_posix() for f in src.rglob("*")
+    )
+    for f in files:
+        g = MPath(f)  # Fetch the stat() results from the board
+        assert (f.is_dir(), f.stat().st_size) == (g.is_dir(), g.stat().st_size)
+        assert f.stat().st_mtime == g.stat().st_mtime
+
+
+def test_walk(testfolder: MPath, localdata: Path) -> None:
+    "Test walking a directory tree on the board."
+    src, dest = Path("./src"), MPath("./src")
+    mpfsops.rcopy(src, dest)
+    local = [(d.as_posix(), [f.name for f in fs]) for d, fs in mpfsops.walk(src)]
+    remote = [(d.as_posix(), [f.name for f in fs]) for d, fs in mpfsops.walk(dest)]
+    assert local == remote
+    assert [d for d, _ in mpfsops.walk(dest, 0)] == [dest]
+
+
+def test_skip_file(testfolder: MPath, localdata: Path) -> None:
+    "Test checking if files need to be copied."
+    src, dest = Path("./src/ota/status.py"), MPath("status.py")
+    assert mpfsops.skip_file(Path("./src"), MPath(".")) is True
+    dest.write_text("Hello world\n")
+    assert mpfsops.skip_file(src, dest) is False  # Sizes differ
+    assert mpfsops.skip_file(src, MPath(".")) is False
+
+
+def test_check_files(testfolder: MPath, localdata: Path) -> None:
+    "Test checking files for a command."
+    src, dest = MPath("src"), MPath("dest")
+    mpfsops.rcopy(Path("./src"), src)
+    files = [src, src / "ota/status.py"]
+    assert mpfsops.check_files("cp", files, dest, "r") == (files, dest)
+    assert mpfsops.check_files("cp", files, dest) == ([], None)
+    assert mpfsops.check_files("cp", [*files, MPath("x")], dest, "r") == ([], None)
+    assert mpfsops.check_files("cp", files, src / "ota", "r") == ([], None)
+    assert mpfsops.check_files("mv", files[1:], files[1]) == ([], None)
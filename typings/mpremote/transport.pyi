@@ -0,0 +1,9 @@
+class TransportError(Exception): ...
+
+class TransportExecError(TransportError):
+    status_code: int
+    error_output: str
+
+    def __init__(self, status_code: int, error_output: str) -> None: ...
+
+def _convert_filesystem_error(e: TransportExecError, info: str) -> Exception: ...